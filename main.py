@@ -4,9 +4,10 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import pydeck as pdk
 import os
-from utils import clean_column_names, drop_missing, plot_bar_top, plot_scatter
+from utils import plot_bar_top, plot_scatter
+from utils import ResultCache, AggregateEngine, start_api_server
+from utils import seller_category_breakdown
 import plotly.express as px
-import numpy as np
 
 # --- Page Setup ---
 st.set_page_config(page_title="SSDC 2025 E-Commerce Dashboard", layout="wide")
@@ -20,10 +21,45 @@ if os.path.exists(logo_path):
 st.markdown("<h4 style='text-align:center; color:#1a237e;'>SSDC 2025 E-Commerce Dashboard</h4>", unsafe_allow_html=True)
 
 # --- Fungsi Load ---
-@st.cache_data
+@st.cache_data(max_entries=16, ttl=6 * 3600)
 def load_data(file_name):
     return pd.read_csv(os.path.join("data", file_name))
 
+# Cache hasil antara bersama untuk semua sesi, dengan batas byte dan eviksi.
+# Atur lewat env: SSDC_CACHE_MAX_MB, SSDC_CACHE_POLICY (lru/lfu), SSDC_CACHE_SPILL_DIR,
+# SSDC_CACHE_MAX_SPILL_MB (batas disk untuk spill).
+@st.cache_resource
+def get_result_cache():
+    return ResultCache(
+        max_bytes=int(float(os.environ.get("SSDC_CACHE_MAX_MB", "512")) * 1024 ** 2),
+        policy=os.environ.get("SSDC_CACHE_POLICY", "lru"),
+        spill_dir=os.environ.get("SSDC_CACHE_SPILL_DIR") or None,
+        max_spill_bytes=int(float(os.environ.get("SSDC_CACHE_MAX_SPILL_MB", "2048")) * 1024 ** 2),
+    )
+
+result_cache = get_result_cache()
+
+# Engine agregat bersama: dipakai halaman ini dan API JSON, jadi angkanya selalu sama
+@st.cache_resource
+def get_aggregate_engine():
+    return AggregateEngine(get_result_cache())
+
+engine = get_aggregate_engine()
+
+# API JSON read-only opsional (aktif kalau SSDC_API_PORT di-set), satu server per proses.
+# Exception tidak disimpan oleh st.cache_resource, jadi gagal bind (mis. port dipakai)
+# dicoba lagi di rerun berikutnya dan ditampilkan di sidebar, bukan di-cache sebagai None.
+@st.cache_resource
+def get_aggregates_api(host, port):
+    return start_api_server(engine, host=host, port=port)
+
+aggregates_api = None
+if os.environ.get("SSDC_API_PORT"):
+    try:
+        aggregates_api = get_aggregates_api(os.environ.get("SSDC_API_HOST", "127.0.0.1"), int(os.environ["SSDC_API_PORT"]))
+    except (OSError, ValueError) as e:
+        st.sidebar.warning(f"API agregat tidak bisa dijalankan (SSDC_API_PORT={os.environ['SSDC_API_PORT']}): {e}")
+
 # --- 1. Executive Summary ---
 st.subheader("📈 Executive Summary")
 st.markdown("""
@@ -56,7 +92,7 @@ st.markdown("""
 
 # --- 2. Purchase & Payment ---
 st.subheader("\U0001F4B3 Analisis Pembayaran dan Pembelian")
-payments = load_data("order_payments_dataset.csv")
+payments = engine.dataset("order_payments_dataset.csv")
 
 fig = px.histogram(
     payments,
@@ -82,17 +118,10 @@ st.markdown("""
 
 # --- 3. Delivery & Satisfaction ---
 st.subheader("\U0001F69A Keterlambatan & Kepuasan Pelanggan")
-orders = load_data("orders_dataset.csv")
-reviews = load_data("order_reviews_dataset.csv")
-merged = orders.merge(reviews, on="order_id")
-merged['delay'] = (pd.to_datetime(merged['order_delivered_customer_date']) -
-                   pd.to_datetime(merged['order_estimated_delivery_date'])).dt.days
-merged = merged.dropna(subset=['delay', 'review_score'])
-merged = merged[merged['delay'] >= 0]  # hanya ambil yang terlambat atau tepat waktu
+merged = engine.delay_frame()
 
 # Urutkan skor review
 review_order = [1, 2, 3, 4, 5]
-merged['review_score'] = pd.Categorical(merged['review_score'], categories=review_order, ordered=True)
 
 fig3 = px.box(
     merged,
@@ -128,23 +157,11 @@ st.markdown("""
 
 # --- 4. Product Insight ---
 st.subheader("📦 Analisis Produk dan Review")
-items = load_data("order_items_dataset.csv")
-products = load_data("products_dataset.csv")
-reviews = load_data("order_reviews_dataset.csv")
-prod_cat = load_data("product_category_name_translation.csv")
-# Cleaning kolom
-items = clean_column_names(items)
-products = clean_column_names(products)
-reviews = clean_column_names(reviews)
-prod_cat = clean_column_names(prod_cat)
-# Merge
-df = items.merge(products, on="product_id").merge(reviews, on="order_id")
-df = df.merge(prod_cat, on="product_category_name", how="left")
-df = drop_missing(df)
+# Item + produk + review + kategori (kolom sudah dibersihkan oleh read_dataset)
+df = engine.product_frame()
 
 # Top 10 Kategori Produk (Penjualan)
-top_cat = df.groupby("product_category_name_english")["price"].sum().sort_values(ascending=False).head(10)
-top_cat_df = top_cat.reset_index().sort_values("price")
+top_cat_df = engine.aggregate("top_categories", n=10).sort_values("price")
 fig4 = px.bar(
     top_cat_df,
     x="price",
@@ -169,9 +186,45 @@ st.markdown("""
 - Kurasi ulang kategori berat ekstrem.
 """)
 
+# --- Eksplorasi Produk Serupa ---
+st.markdown("#### 🔍 Eksplorasi Produk Serupa")
+st.markdown("Cari produk dengan karakteristik fisik dan konten (berat, dimensi, foto, deskripsi) paling mirip, lengkap dengan performa penjualan dan review-nya.")
+# Index KD-tree + performa produk dibangun sekali oleh engine dan disimpan di cache bersama
+product_index = engine.product_index()
+product_table = product_index.table
+
+colS1, colS2, colS3 = st.columns([2, 3, 1])
+with colS1:
+    # category_label jatuh ke nama Portugis / "unknown", jadi semua produk bisa dipilih
+    sim_categories = sorted(product_table["category_label"].unique())
+    sim_cat = st.selectbox("Kategori", sim_categories, key="sim_cat")
+with colS2:
+    # Urutkan produk di kategori terpilih berdasarkan penjualan agar produk populer muncul duluan
+    cat_products = product_table.loc[product_table["category_label"] == sim_cat, ["product_id", "total_sales"]]
+    cat_products = cat_products.sort_values("total_sales", ascending=False)
+    sim_labels = dict(zip(cat_products["product_id"], cat_products["total_sales"]))
+    sim_product = st.selectbox(
+        "Produk",
+        cat_products["product_id"],
+        format_func=lambda pid: f"{pid} (R$ {sim_labels[pid]:,.0f})",
+        key="sim_product"
+    )
+with colS3:
+    sim_k = st.number_input("Jumlah (k)", min_value=1, max_value=50, value=5, key="sim_k")
+sim_same_cat = st.checkbox("Hanya kategori yang sama", value=False, key="sim_same_cat")
+
+if sim_product is not None:
+    similar = product_index.similar(sim_product, k=int(sim_k), same_category=sim_same_cat)
+    st.dataframe(
+        similar[["product_id", "category_label", "distance", "total_orders", "total_sales", "avg_review", "total_reviews"]
+                + product_index.features],
+        hide_index=True
+    )
+    st.caption("Jarak dihitung pada atribut yang dinormalisasi (log1p + z-score) menggunakan KD-tree; makin kecil makin mirip.")
+
 # --- 5. Market Geography ---
 st.subheader("\U0001F5FA\uFE0F Persebaran Pelanggan")
-customers = load_data("customers_dataset.csv")
+customers = engine.dataset("customers_dataset.csv")
 geo = load_data("geolocation_dataset.csv")
 
 geo_group = geo.groupby('geolocation_zip_code_prefix').agg({
@@ -249,8 +302,7 @@ st.markdown("""
 st.markdown("""
 **Insight:** Kategori produk dengan total penjualan tertinggi menunjukkan fokus utama bisnis dan peluang promosi.
 """)
-top_cat_sales = df.groupby("product_category_name_english")["price"].sum().sort_values(ascending=False).head(10)
-top_cat_sales_df = top_cat_sales.reset_index().sort_values("price")
+top_cat_sales_df = engine.aggregate("top_categories", n=10).sort_values("price")
 fig_top_cat = px.bar(
     top_cat_sales_df,
     x="price",
@@ -272,9 +324,8 @@ st.markdown("""
 st.markdown("""
 **Insight:** Metode pembayaran yang paling sering digunakan dapat menjadi acuan strategi promosi pembayaran/cicilan.
 """)
-payments = load_data("order_payments_dataset.csv")
-pay_type = payments["payment_type"].value_counts().reset_index()
-pay_type.columns = ["payment_type", "count"]
+payments = engine.dataset("order_payments_dataset.csv")
+pay_type = engine.aggregate("payment_types")
 fig_pay_type = px.bar(
     pay_type,
     x="payment_type",
@@ -316,8 +367,7 @@ st.markdown("""
 =======
 **Insight:** Keterlambatan pengiriman berdampak signifikan pada review buruk, namun ada sebagian order telat yang tetap mendapat review bagus. Analisis lebih lanjut diperlukan.
 """)
-# Normalisasi delay (log1p agar tidak bias outlier)
-merged['delay_log'] = (merged['delay']+1).apply(np.log1p)
+# delay_log (log1p agar tidak bias outlier) sudah dihitung di build_delay_frame
 fig_review_delay = px.box(
     merged,
     x="review_score",
@@ -393,7 +443,7 @@ st.caption("Order telat yang tetap mendapat review bagus cenderung memiliki harg
 
 # --- 5. Market Geography ---
 st.subheader("\U0001F5FA\uFE0F Persebaran Pelanggan")
-customers = load_data("customers_dataset.csv")
+customers = engine.dataset("customers_dataset.csv")
 geo = load_data("geolocation_dataset.csv")
 
 geo_group = geo.groupby('geolocation_zip_code_prefix').agg({
@@ -471,8 +521,7 @@ st.markdown("""
 st.markdown("""
 **Insight:** Kategori produk dengan total penjualan tertinggi menunjukkan fokus utama bisnis dan peluang promosi.
 """)
-top_cat_sales = df.groupby("product_category_name_english")["price"].sum().sort_values(ascending=False).head(10)
-top_cat_sales_df = top_cat_sales.reset_index().sort_values("price")
+top_cat_sales_df = engine.aggregate("top_categories", n=10).sort_values("price")
 fig_top_cat = px.bar(
     top_cat_sales_df,
     x="price",
@@ -494,9 +543,8 @@ st.markdown("""
 st.markdown("""
 **Insight:** Metode pembayaran yang paling sering digunakan dapat menjadi acuan strategi promosi pembayaran/cicilan.
 """)
-payments = load_data("order_payments_dataset.csv")
-pay_type = payments["payment_type"].value_counts().reset_index()
-pay_type.columns = ["payment_type", "count"]
+payments = engine.dataset("order_payments_dataset.csv")
+pay_type = engine.aggregate("payment_types")
 fig_pay_type = px.bar(
     pay_type,
     x="payment_type",
@@ -577,8 +625,7 @@ st.markdown("""
 st.markdown("""
 **Insight:** Kategori produk dengan review bagus (4/5) terbanyak adalah peluang untuk pengembangan produk unggulan.
 """)
-top_cat_good_review = df[df["review_score"]>=4].groupby("product_category_name_english")["review_score"].count().sort_values(ascending=False).head(10)
-top_cat_good_review_df = top_cat_good_review.reset_index().sort_values("review_score")
+top_cat_good_review_df = engine.aggregate("good_review_categories", n=10).sort_values("review_score")
 fig_top_cat_good = px.bar(
     top_cat_good_review_df,
     x="review_score",
@@ -598,8 +645,7 @@ st.markdown("""
 st.markdown("""
 **Insight:** Kota/provinsi dengan pelanggan terbanyak adalah target utama ekspansi dan promosi.
 """)
-cust_city = customers["customer_city"].value_counts().head(10).reset_index()
-cust_city.columns = ["customer_city", "count"]
+cust_city = engine.aggregate("customers_per_city", n=10)
 fig_city = px.bar(
     cust_city,
     x="count",
@@ -615,8 +661,7 @@ st.markdown("""
 **Solusi:** Prioritaskan kampanye marketing dan ekspansi logistik di kota/provinsi dengan pelanggan terbanyak untuk pertumbuhan pesat.
 """)
 
-cust_state = customers["customer_state"].value_counts().head(10).reset_index()
-cust_state.columns = ["customer_state", "count"]
+cust_state = engine.aggregate("customers_per_state", n=10)
 fig_state = px.bar(
     cust_state,
     x="count",
@@ -713,3 +758,74 @@ if "product_photos_qty" in df.columns:
     st.markdown("""
     **Solusi:** Wajibkan minimal 3-5 foto berkualitas untuk setiap produk agar meningkatkan kepercayaan dan review positif.
     """)
+
+# --- 10. Kinerja Penjual ---
+st.subheader("🏪 Kinerja Penjual")
+st.markdown("""
+Skor kinerja (0-100) tiap penjual menggabungkan rata-rata review, ketepatan pengiriman, revenue, dan porsi ongkir.
+Leaderboard hanya memuat penjual dengan minimal 5 order. Pada pengelompokan per kategori, tiap penjual diperingkat
+di setiap kategori yang dijualnya dengan metrik yang dihitung dalam kategori tersebut.
+""")
+seller_perf = engine.seller_performance()
+seller_metrics = {
+    "score": "Skor Kinerja",
+    "revenue": "Revenue (R$)",
+    "orders": "Jumlah Order",
+    "avg_review": "Rata-rata Review",
+    "late_rate": "Late Rate",
+    "freight_share": "Porsi Ongkir",
+}
+seller_groupings = {"Semua Penjual": None, "Provinsi": "seller_state", "Kategori": "category"}
+seller_cols = ["seller_city", "seller_state", "main_category", "revenue", "orders", "avg_review", "late_rate", "freight_share", "score"]
+
+colL1, colL2, colL3, colL4 = st.columns([2, 2, 2, 1])
+with colL1:
+    lb_metric = st.selectbox("Metrik", list(seller_metrics), format_func=seller_metrics.get, key="lb_metric")
+with colL2:
+    lb_by = seller_groupings[st.selectbox("Kelompokkan per", list(seller_groupings), key="lb_by")]
+leaderboards = engine.seller_leaderboards(metric=lb_metric)
+with colL3:
+    lb_group = st.selectbox("Grup", leaderboards.groups(lb_by), key="lb_group") if lb_by else None
+with colL4:
+    lb_k = st.number_input("Top/Bottom k", min_value=1, max_value=leaderboards.max_k, value=10, key="lb_k")
+
+# Per kategori, tampilkan kategori baris tersebut (bukan kategori utama penjual)
+lb_cols = [("category" if c == "main_category" else c) for c in seller_cols] if lb_by == "category" else seller_cols
+colT, colB = st.columns(2)
+with colT:
+    st.markdown(f"**{seller_metrics[lb_metric]} Tertinggi**")
+    st.dataframe(leaderboards.top(lb_by, lb_group, int(lb_k))[lb_cols])
+with colB:
+    st.markdown(f"**{seller_metrics[lb_metric]} Terendah**")
+    st.dataframe(leaderboards.bottom(lb_by, lb_group, int(lb_k))[lb_cols])
+
+# Drill-down satu penjual dari leaderboard yang sedang ditampilkan
+lb_sellers = list(dict.fromkeys(
+    list(leaderboards.top(lb_by, lb_group, int(lb_k)).index) + list(leaderboards.bottom(lb_by, lb_group, int(lb_k)).index)
+))
+drill_seller = st.selectbox("Detail penjual", lb_sellers, key="drill_seller")
+if drill_seller is not None:
+    drill = seller_perf.loc[drill_seller]
+    colD1, colD2, colD3, colD4 = st.columns(4)
+    colD1.metric("Skor", f"{drill['score']:.1f}")
+    colD2.metric("Revenue", f"R$ {drill['revenue']:,.0f}")
+    colD3.metric("Rata-rata Review", f"{drill['avg_review']:.2f}")
+    colD4.metric("Late Rate", f"{drill['late_rate']:.0%}")
+    drill_cat = seller_category_breakdown(engine.seller_category_performance(), drill_seller)
+    st.dataframe(drill_cat, hide_index=True)
+
+st.markdown("""
+**Solusi:** Jadikan penjual dengan skor tertinggi sebagai referensi best practice, dan dampingi penjual dengan late rate atau porsi ongkir tinggi untuk perbaikan logistik.
+""")
+
+# --- Statistik Cache (untuk menentukan ukuran SSDC_CACHE_MAX_MB) ---
+with st.sidebar.expander("⚙️ Statistik Cache"):
+    cache_stats = result_cache.stats()
+    st.metric("Hit rate", f"{cache_stats['hit_rate']:.0%}")
+    st.write(f"Pemakaian: {cache_stats['bytes'] / 1024 ** 2:.1f} / {cache_stats['max_bytes'] / 1024 ** 2:.0f} MB ({cache_stats['entries']} entri)")
+    st.write(f"Hit: {cache_stats['hits']} · Miss: {cache_stats['misses']} · Eviksi: {cache_stats['evictions']}")
+    if aggregates_api is not None:
+        api_host, api_port = aggregates_api.server_address[:2]
+        st.write(f"API agregat: `http://{api_host}:{api_port}/api/aggregates`")
+    if result_cache.spill_dir:
+        st.write(f"Spill ke disk: {cache_stats['spilled_entries']} entri ({cache_stats['spilled_bytes'] / 1024 ** 2:.1f} / {cache_stats['max_spill_bytes'] / 1024 ** 2:.0f} MB), hit disk: {cache_stats['disk_hits']}")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Supaya `import utils` berjalan saat pytest dijalankan dari folder mana pun
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,153 @@
+import http.client
+import json
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+from utils.aggregates import AggregateEngine
+from utils.api import etag_matches, make_server
+from utils.cache import ResultCache
+
+DATASETS = {
+    "customers_dataset.csv": pd.DataFrame({
+        "customer_id": ["c1", "c2", "c3", "c4"],
+        "customer_state": ["SP", "SP", "RJ", "MG"],
+        "customer_city": ["sao paulo", "sao paulo", "rio de janeiro", "belo horizonte"],
+    }),
+    # Sengaja tanpa kolom payment_type: memicu error tak terduga (500)
+    "order_payments_dataset.csv": pd.DataFrame({"order_id": ["o1", "o2", "o3"]}),
+}
+
+
+def loader(file_name):
+    if file_name not in DATASETS:
+        raise FileNotFoundError(2, "No such file", file_name)
+    return DATASETS[file_name]
+
+
+@pytest.fixture(scope="module")
+def server():
+    engine = AggregateEngine(ResultCache(), loader=loader)
+    srv = make_server(engine, port=0)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def request(server, path, method="GET", headers=None):
+    conn = http.client.HTTPConnection(*server.server_address[:2], timeout=5)
+    conn.request(method, path, headers=headers or {})
+    resp = conn.getresponse()
+    body = resp.read()
+    conn.close()
+    return resp.status, resp.headers, json.loads(body) if body else None
+
+
+def test_list_aggregates(server):
+    status, _, body = request(server, "/api/aggregates")
+    assert status == 200
+    assert "customers_per_state" in body["aggregates"]
+
+
+def test_records_format(server):
+    status, headers, body = request(server, "/api/aggregates/customers_per_state")
+    assert status == 200
+    assert headers["Content-Type"].startswith("application/json")
+    assert body["data"] == [
+        {"customer_state": "SP", "count": 2},
+        {"customer_state": "RJ", "count": 1},
+        {"customer_state": "MG", "count": 1},
+    ]
+
+
+def test_columns_format(server):
+    status, _, body = request(server, "/api/aggregates/customers_per_state?format=columns")
+    assert status == 200
+    assert body["columns"] == ["customer_state", "count"]
+    assert body["data"] == {"customer_state": ["SP", "RJ", "MG"], "count": [2, 1, 1]}
+
+
+def test_n_limits_rows(server):
+    _, _, body = request(server, "/api/aggregates/customers_per_state?n=1")
+    assert body["data"] == [{"customer_state": "SP", "count": 2}]
+
+
+def test_n_is_clamped_to_row_count(server):
+    _, etag_all, _ = request(server, "/api/aggregates/customers_per_state?n=3")
+    _, etag_big, body = request(server, "/api/aggregates/customers_per_state?n=100000")
+    assert len(body["data"]) == 3
+    assert etag_all["ETag"] == etag_big["ETag"]
+
+
+def test_if_none_match_returns_304(server):
+    _, headers, _ = request(server, "/api/aggregates/customers_per_city")
+    etag = headers["ETag"]
+    status, headers, body = request(server, "/api/aggregates/customers_per_city", headers={"If-None-Match": etag})
+    assert status == 304
+    assert headers["ETag"] == etag
+    assert body is None
+    status, _, _ = request(server, "/api/aggregates/customers_per_city", headers={"If-None-Match": '"lain"'})
+    assert status == 200
+
+
+def test_etag_differs_per_format(server):
+    _, records, _ = request(server, "/api/aggregates/customers_per_state")
+    _, columns, _ = request(server, "/api/aggregates/customers_per_state?format=columns")
+    assert records["ETag"] != columns["ETag"]
+
+
+@pytest.mark.parametrize("query", ["format=xml", "n=0", "n=-1", "n=abc", "n=%C2%B2", "n=" + "9" * 5000])
+def test_bad_query_returns_400(server, query):
+    status, _, body = request(server, f"/api/aggregates/customers_per_state?{query}")
+    assert status == 400
+    assert "error" in body
+
+
+@pytest.mark.parametrize("path", ["/api/aggregates/tidak_ada", "/api/lain", "/api/aggregates/a/b"])
+def test_unknown_path_returns_404(server, path):
+    status, _, _ = request(server, path)
+    assert status == 404
+
+
+def test_write_methods_return_405(server):
+    for method in ("POST", "PUT", "DELETE"):
+        status, headers, _ = request(server, "/api/aggregates", method=method)
+        assert status == 405
+        assert headers["Allow"] == "GET, HEAD"
+
+
+def test_missing_dataset_returns_503(server):
+    status, _, body = request(server, "/api/aggregates/top_categories")
+    assert status == 503
+    assert "order_items_dataset.csv" in body["error"]
+
+
+def test_unexpected_error_returns_500(server):
+    status, _, body = request(server, "/api/aggregates/payment_types")
+    assert status == 500
+    assert "KeyError" in body["error"]
+
+
+def test_etag_matches():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"x"')
+    assert not etag_matches(None, '"x"')
+    assert not etag_matches('"a"', '"b"')
+
+
+def test_changed_csv_invalidates_dataset_and_aggregate(tmp_path):
+    path = tmp_path / "customers_dataset.csv"
+    DATASETS["customers_dataset.csv"].to_csv(path, index=False)
+    engine = AggregateEngine(ResultCache(), loader=lambda f: pd.read_csv(tmp_path / f), data_dir=str(tmp_path))
+    assert len(engine.aggregate("customers_per_state")) == 3
+    assert engine.dataset("customers_dataset.csv") is engine.dataset("customers_dataset.csv")
+
+    extra = pd.DataFrame({"customer_id": ["c5"], "customer_state": ["BA"], "customer_city": ["salvador"]})
+    pd.concat([DATASETS["customers_dataset.csv"], extra]).to_csv(path, index=False)
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10 ** 9))
+    assert len(engine.dataset("customers_dataset.csv")) == 5
+    assert len(engine.aggregate("customers_per_state")) == 4
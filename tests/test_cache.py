@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from utils.cache import ResultCache, estimate_size
+
+FRAME = pd.DataFrame({"a": range(1000)})
+SIZE = estimate_size(FRAME)
+
+
+def frame():
+    return FRAME.copy()
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResultCache(max_bytes=2 * SIZE)
+    cache.put("a", frame())
+    cache.put("b", frame())
+    cache.get("a")
+    cache.put("c", frame())
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lfu_evicts_least_frequently_used():
+    cache = ResultCache(max_bytes=2 * SIZE, policy="lfu")
+    cache.put("a", frame())
+    cache.put("b", frame())
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+    cache.put("c", frame())
+    # b (2x) lebih jarang dipakai dari a (3x); c baru dimasukkan dan tidak langsung dibuang
+    assert "b" not in cache
+    cache.put("d", frame())
+    assert "a" in cache and "d" in cache and "c" not in cache
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        ResultCache(policy="fifo")
+
+
+def test_hit_miss_counters():
+    cache = ResultCache()
+    assert cache.get("x") is None
+    cache.put("x", 1)
+    assert cache.get("x") == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_freq_does_not_outlive_entries():
+    cache = ResultCache(max_bytes=1000)
+    for i in range(2000):
+        cache.put(i, "x" * 300)
+    assert len(cache._freq) == len(cache) <= 3
+
+
+def test_get_or_compute_computes_once():
+    cache = ResultCache()
+    calls = []
+    barrier = threading.Barrier(5)
+
+    def compute():
+        calls.append(1)
+        # Tahan cukup lama supaya thread lain sudah miss dan menunggu lock key
+        time.sleep(0.05)
+        return 42
+
+    def worker():
+        barrier.wait()
+        assert cache.get_or_compute("k", compute) == 42
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    # Thread yang menunggu lalu dilayani hasil thread lain dihitung sebagai hit
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (4, 1)
+
+
+def test_get_or_compute_reloads_spilled_entry(tmp_path):
+    cache = ResultCache(max_bytes=SIZE, spill_dir=str(tmp_path))
+    cache.put("a", frame())
+    cache.put("b", frame())
+    result = cache.get_or_compute("a", lambda: pytest.fail("entri di disk tidak boleh dihitung ulang"))
+    pd.testing.assert_frame_equal(result, FRAME)
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_spill_and_reload(tmp_path):
+    cache = ResultCache(max_bytes=SIZE, spill_dir=str(tmp_path))
+    cache.put("a", frame())
+    cache.put("b", frame())
+    assert cache.stats()["spilled_entries"] == 1
+    assert len(os.listdir(tmp_path)) == 1
+
+    reloaded = cache.get("a")
+    pd.testing.assert_frame_equal(reloaded, FRAME)
+    stats = cache.stats()
+    assert stats["disk_hits"] == 1
+    # a kembali ke memori, b gantian di-spill
+    assert "a" in cache._entries and "b" in cache._spilled
+
+
+def test_oversized_entry_served_from_disk_without_respill(tmp_path):
+    cache = ResultCache(max_bytes=SIZE // 2, spill_dir=str(tmp_path))
+    cache.put("big", frame())
+    spills = cache.stats()["spills"]
+    for _ in range(3):
+        pd.testing.assert_frame_equal(cache.get("big"), FRAME)
+    assert cache.stats()["spills"] == spills
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_spill_budget_drops_oldest(tmp_path):
+    cache = ResultCache(max_bytes=SIZE, spill_dir=str(tmp_path), max_spill_bytes=int(2.5 * SIZE))
+    for i in range(6):
+        cache.put(i, frame())
+    stats = cache.stats()
+    assert stats["spilled_bytes"] <= stats["max_spill_bytes"]
+    assert len(os.listdir(tmp_path)) == stats["spilled_entries"] == 2
+    assert 0 not in cache and 4 in cache
+
+
+def test_spill_dir_cleared_on_start(tmp_path):
+    (tmp_path / "stale.pkl").write_bytes(b"old")
+    (tmp_path / "keep.txt").write_text("not ours")
+    ResultCache(spill_dir=str(tmp_path))
+    assert os.listdir(tmp_path) == ["keep.txt"]
+
+
+def test_clear_removes_spill_files(tmp_path):
+    cache = ResultCache(max_bytes=SIZE, spill_dir=str(tmp_path))
+    cache.put("a", frame())
+    cache.put("b", frame())
+    cache.clear()
+    assert len(cache) == 0 and os.listdir(tmp_path) == []
+    assert cache.stats()["spilled_bytes"] == 0
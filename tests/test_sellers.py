@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.sellers import (SellerLeaderboards, _select, build_seller_item_frame, seller_category_performance,
+                           seller_performance, seller_score)
+
+ORDERS = pd.DataFrame({
+    "order_id": ["o1", "o2", "o3", "o4"],
+    # o1 terkirim di hari estimasi (beda jam saja), o2 telat 2 hari, o3 belum terkirim
+    "order_delivered_customer_date": ["2018-01-10 15:00:00", "2018-01-12 08:00:00", None, "2018-01-05 10:00:00"],
+    "order_estimated_delivery_date": ["2018-01-10 00:00:00", "2018-01-10 00:00:00", "2018-01-10 00:00:00",
+                                      "2018-01-08 00:00:00"],
+})
+ITEMS = pd.DataFrame({
+    "order_id": ["o1", "o1", "o2", "o3", "o4"],
+    "seller_id": ["s1", "s1", "s1", "s2", "s2"],
+    "product_id": ["p1", "p2", "p1", "p3", "p1"],
+    "price": [10.0, 20.0, 30.0, 40.0, 50.0],
+    "freight_value": [1.0, 2.0, 3.0, 4.0, 5.0],
+})
+REVIEWS = pd.DataFrame({"order_id": ["o1", "o2", "o4"], "review_score": [5, 1, 4]})
+PRODUCTS = pd.DataFrame({
+    "product_id": ["p1", "p2", "p3"],
+    "product_category_name": ["beleza_saude", "brinquedos", None],
+})
+PROD_CAT = pd.DataFrame({
+    "product_category_name": ["beleza_saude"],
+    "product_category_name_english": ["health_beauty"],
+})
+SELLERS = pd.DataFrame({"seller_id": ["s1", "s2"], "seller_city": ["campinas", "rio"], "seller_state": ["SP", "RJ"]})
+
+
+@pytest.fixture
+def frame():
+    return build_seller_item_frame(ITEMS, ORDERS, REVIEWS, PRODUCTS, PROD_CAT)
+
+
+def test_late_uses_whole_days(frame):
+    status = frame.drop_duplicates("order_id").set_index("order_id")
+    # Terkirim di hari estimasi tidak dihitung telat
+    assert status["late"].to_dict() == {"o1": False, "o2": True, "o3": False, "o4": False}
+    assert status["delivered"].to_dict() == {"o1": True, "o2": True, "o3": False, "o4": True}
+
+
+def test_category_falls_back_to_portuguese_then_unknown(frame):
+    categories = frame.drop_duplicates("product_id").set_index("product_id")["category"]
+    assert categories.to_dict() == {"p1": "health_beauty", "p2": "brinquedos", "p3": "unknown"}
+
+
+def test_multi_item_order_counted_once(frame):
+    perf = seller_performance(frame, SELLERS)
+    s1 = perf.loc["s1"]
+    assert s1["revenue"] == 60.0
+    assert (s1["orders"], s1["delivered_orders"], s1["late_orders"]) == (2, 2, 1)
+    assert s1["late_rate"] == 0.5
+    # Review o1 dihitung sekali, bukan sekali per item
+    assert s1["avg_review"] == 3.0
+    assert s1["main_category"] == "health_beauty"
+    assert s1["seller_state"] == "SP"
+    s2 = perf.loc["s2"]
+    assert (s2["orders"], s2["delivered_orders"], s2["late_rate"]) == (2, 1, 0.0)
+
+
+def test_category_performance_per_pair(frame):
+    perf = seller_performance(frame, SELLERS)
+    cat_perf = seller_category_performance(frame, perf)
+    s1 = cat_perf.loc["s1"].set_index("category")
+    assert s1["orders"].to_dict() == {"brinquedos": 1, "health_beauty": 2}
+    assert s1["avg_review"].to_dict() == {"brinquedos": 5.0, "health_beauty": 3.0}
+    assert (cat_perf["seller_state"].loc["s1"] == "SP").all()
+
+
+def test_score_ranks_revenue_within_category():
+    perf = pd.DataFrame({
+        "category": ["a", "a", "b", "b"],
+        "revenue": [10.0, 20.0, 1000.0, 2000.0],
+        "avg_review": [5.0, 5.0, 5.0, np.nan],
+        "late_rate": [0.0, 0.0, 0.0, 0.0],
+        "freight_share": [0.1, 0.1, 0.1, 0.1],
+    }, index=["s1", "s2", "s1", "s2"])
+    score = seller_score(perf, within="category")
+    # Posisi revenue di kategori b sama dengan di kategori a, meski angkanya jauh lebih besar
+    assert list(score.index) == ["s1", "s2", "s1", "s2"]
+    assert score.iloc[0] == score.iloc[2] and score.iloc[1] == score.iloc[3]
+    assert score.iloc[1] > score.iloc[0]
+
+
+def test_select_matches_full_sort_and_drops_nan():
+    rng = np.random.default_rng(0)
+    values = pd.Series(rng.integers(0, 20, 200).astype(float))
+    values[rng.choice(200, 30, replace=False)] = np.nan
+    top, bottom = _select(values, 10)
+    valid = values.dropna()
+    assert list(values.iloc[top]) == list(valid.sort_values(ascending=False).head(10))
+    assert list(values.iloc[bottom]) == list(valid.sort_values().head(10))
+    all_top, _ = _select(values, 1000)
+    assert len(all_top) == len(valid)
+
+
+def test_leaderboards_per_group():
+    perf = pd.DataFrame({
+        "orders": [10, 10, 10, 1],
+        "score": [90.0, 50.0, 70.0, 99.0],
+        "seller_state": ["SP", "SP", "RJ", "RJ"],
+    }, index=pd.Index(["s1", "s2", "s3", "s4"], name="seller_id"))
+    cat_perf = pd.DataFrame({
+        "category": ["toys", "toys", "health", "health"],
+        "orders": [8, 6, 5, 9],
+        "score": [40.0, 80.0, 60.0, 30.0],
+    }, index=pd.Index(["s1", "s2", "s1", "s3"], name="seller_id"))
+    boards = SellerLeaderboards(perf, cat_perf, min_orders=5)
+
+    assert boards.groups("seller_state") == ["RJ", "SP"]
+    assert boards.groups("category") == ["health", "toys"]
+    # s4 di bawah min_orders, jadi tidak masuk peringkat
+    assert list(boards.top().index) == ["s1", "s3", "s2"]
+    assert list(boards.bottom(k=1).index) == ["s2"]
+    assert list(boards.top("seller_state", "RJ").index) == ["s3"]
+    assert list(boards.top("category", "toys").index) == ["s2", "s1"]
+    assert list(boards.bottom("category", "health").index) == ["s3", "s1"]
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.similarity import PRODUCT_FEATURES, ProductIndex, product_performance
+
+PRODUCTS = pd.DataFrame({
+    "product_id": ["p1", "p2", "p3", "p4", "p5"],
+    "product_category_name": ["beleza_saude", "beleza_saude", "beleza_saude", "brinquedos", None],
+    "product_category_name_english": ["health_beauty", "health_beauty", "health_beauty", None, None],
+    "product_weight_g": [100, 110, 5000, 105, 100],
+    "product_length_cm": [10, 11, 60, 10, 10],
+    "product_height_cm": [5, 5, 40, 5, None],
+    "product_width_cm": [8, 8, 50, 8, 8],
+    "product_photos_qty": [1, 1, 4, 1, 1],
+    "product_description_lenght": [300, 320, 2000, 310, 300],
+})
+ITEMS = pd.DataFrame({
+    "order_id": ["o1", "o1", "o2", "o3"],
+    "product_id": ["p1", "p1", "p1", "p2"],
+    "price": [10.0, 10.0, 12.0, 30.0],
+})
+REVIEWS = pd.DataFrame({"order_id": ["o1", "o2", "o3"], "review_score": [5, 3, 4]})
+
+
+@pytest.fixture(scope="module")
+def index():
+    return ProductIndex(PRODUCTS, product_performance(ITEMS, REVIEWS))
+
+
+def test_product_performance():
+    perf = product_performance(ITEMS, REVIEWS)
+    assert perf.loc["p1", "total_items"] == 3
+    assert perf.loc["p1", "total_orders"] == 2
+    assert perf.loc["p1", "total_sales"] == 32.0
+    # Review per order, bukan per item: (5 + 3) / 2
+    assert perf.loc["p1", "avg_review"] == 4.0
+    assert perf.loc["p1", "total_reviews"] == 2
+
+
+def test_similar_excludes_itself_and_sorts_by_distance(index):
+    result = index.similar("p1", k=4)
+    assert "p1" not in set(result["product_id"])
+    assert len(result) == 4
+    assert result["distance"].is_monotonic_increasing
+    # p3 jauh lebih besar dari produk lain, jadi paling akhir
+    assert result["product_id"].iloc[-1] == "p3"
+
+
+def test_similar_matches_brute_force(index):
+    result = index.similar("p2", k=4)
+    pos = index.position["p2"]
+    dist = np.linalg.norm(index.points - index.points[pos], axis=1)
+    expected = [index.product_ids[i] for i in np.argsort(dist) if i != pos]
+    np.testing.assert_allclose(result["distance"], np.sort(dist)[1:])
+    assert list(result["product_id"]) == expected
+
+
+def test_same_category_only(index):
+    result = index.similar("p1", k=5, same_category=True)
+    assert list(result["product_id"]) == ["p2", "p3"]
+    assert set(result["category_label"]) == {"health_beauty"}
+
+
+def test_single_product_category_returns_empty(index):
+    result = index.similar("p4", k=5, same_category=True)
+    assert result.empty
+    assert "distance" in result
+
+
+def test_table_joins_and_fills_performance(index):
+    table = index.table.set_index("product_id")
+    assert table.loc["p1", "total_sales"] == 32.0
+    # Produk tanpa penjualan: total diisi 0, review tetap kosong
+    assert table.loc["p4", "total_orders"] == 0
+    assert table.loc["p4", "total_sales"] == 0.0
+    assert np.isnan(table.loc["p4", "avg_review"])
+    assert table.loc[PRODUCTS["product_id"], "category_label"].tolist() == [
+        "health_beauty", "health_beauty", "health_beauty", "brinquedos", "unknown"
+    ]
+
+
+def test_missing_features_filled(index):
+    assert len(index) == len(PRODUCTS)
+    assert index.points.shape == (len(PRODUCTS), len(PRODUCT_FEATURES))
+    assert not np.isnan(index.points).any()
@@ -29,4 +29,15 @@ def plot_scatter(df, x, y, alpha=0.5, title=''):
     ax.set_title(title)
     return fig
 
+# Helper per modul (diimpor setelah helper dasar di atas karena modul ini memakainya)
+from .cache import ResultCache
+from .aggregates import AggregateEngine
+from .sellers import seller_category_breakdown
+from .api import start_api_server
+
+__all__ = [
+    "clean_column_names", "drop_missing", "plot_bar_top", "plot_scatter",
+    "ResultCache", "AggregateEngine", "seller_category_breakdown", "start_api_server",
+]
+
 # Tambahkan helper lain sesuai kebutuhan
@@ -0,0 +1,215 @@
+# Frame gabungan dan agregat yang dipakai bersama oleh dashboard dan API JSON
+import os
+
+import numpy as np
+import pandas as pd
+
+from . import clean_column_names, drop_missing
+from .similarity import ProductIndex, product_performance
+from .sellers import (SellerLeaderboards, build_seller_item_frame, seller_category_performance,
+                      seller_performance, top_sellers)
+
+DATA_DIR = "data"
+
+
+def read_dataset(file_name, data_dir=DATA_DIR):
+    """Baca CSV dari folder data dengan nama kolom yang sudah dibersihkan."""
+    return clean_column_names(pd.read_csv(os.path.join(data_dir, file_name)))
+
+
+def build_delay_frame(orders, reviews):
+    """Order + review dengan kolom delay (hari), hanya order tepat waktu atau terlambat."""
+    merged = orders.merge(reviews, on="order_id")
+    merged['delay'] = (pd.to_datetime(merged['order_delivered_customer_date']) -
+                       pd.to_datetime(merged['order_estimated_delivery_date'])).dt.days
+    merged = merged.dropna(subset=['delay', 'review_score'])
+    merged = merged[merged['delay'] >= 0].copy()  # hanya ambil yang terlambat atau tepat waktu
+    # Urutkan skor review
+    merged['review_score'] = pd.Categorical(merged['review_score'], categories=[1, 2, 3, 4, 5], ordered=True)
+    # Normalisasi delay (log1p agar tidak bias outlier)
+    merged['delay_log'] = (merged['delay']+1).apply(np.log1p)
+    return merged
+
+
+def build_product_frame(items, products, reviews, prod_cat):
+    """Item order + produk + review + nama kategori bahasa Inggris."""
+    df = items.merge(products, on="product_id").merge(reviews, on="order_id")
+    df = df.merge(prod_cat, on="product_category_name", how="left")
+    return drop_missing(df)
+
+
+def top_categories(df, n=10):
+    """Kategori produk dengan total penjualan (price) tertinggi."""
+    top = df.groupby("product_category_name_english")["price"].sum().sort_values(ascending=False)
+    return top.head(n).reset_index()
+
+
+def good_review_categories(df, n=10):
+    """Kategori produk dengan jumlah review bagus (4/5) terbanyak."""
+    good = df[df["review_score"] >= 4].groupby("product_category_name_english")["review_score"].count()
+    return good.sort_values(ascending=False).head(n).reset_index()
+
+
+def payment_type_counts(payments, n=None):
+    """Jumlah transaksi per metode pembayaran."""
+    pay_type = payments["payment_type"].value_counts().head(n).reset_index()
+    pay_type.columns = ["payment_type", "count"]
+    return pay_type
+
+
+def customers_per_state(customers, n=None):
+    """Jumlah pelanggan per provinsi (semua provinsi kalau n=None)."""
+    cust_state = customers["customer_state"].value_counts().head(n).reset_index()
+    cust_state.columns = ["customer_state", "count"]
+    return cust_state
+
+
+def customers_per_city(customers, n=10):
+    """Jumlah pelanggan per kota."""
+    cust_city = customers["customer_city"].value_counts().head(n).reset_index()
+    cust_city.columns = ["customer_city", "count"]
+    return cust_city
+
+
+class AggregateEngine:
+    """Menghitung frame gabungan dan agregat sekali lalu menyimpannya di ResultCache.
+
+    Satu instance dibagi antara halaman Streamlit dan server API, jadi angka
+    yang dilayani API identik dengan yang ditampilkan dashboard.
+    """
+
+    # nama agregat -> (frame gabungan atau file CSV sumber, fungsi agregat, n default)
+    AGGREGATES = {
+        "top_categories": ("product_frame", top_categories, 10),
+        "good_review_categories": ("product_frame", good_review_categories, 10),
+        "payment_types": ("order_payments_dataset.csv", payment_type_counts, None),
+        "customers_per_state": ("customers_dataset.csv", customers_per_state, None),
+        "customers_per_city": ("customers_dataset.csv", customers_per_city, 10),
+        "top_sellers": ("seller_performance", top_sellers, 10),
+    }
+
+    # frame gabungan -> file CSV pembentuknya; versi file ini ikut jadi bagian key cache
+    _SELLER_FILES = ("order_items_dataset.csv", "orders_dataset.csv", "order_reviews_dataset.csv",
+                     "products_dataset.csv", "product_category_name_translation.csv")
+    FRAME_SOURCES = {
+        "delay_frame": ("orders_dataset.csv", "order_reviews_dataset.csv"),
+        "product_frame": ("order_items_dataset.csv", "products_dataset.csv", "order_reviews_dataset.csv",
+                          "product_category_name_translation.csv"),
+        "product_performance": ("order_items_dataset.csv", "order_reviews_dataset.csv"),
+        "product_index": ("products_dataset.csv", "product_category_name_translation.csv",
+                          "order_items_dataset.csv", "order_reviews_dataset.csv"),
+        "seller_item_frame": _SELLER_FILES,
+        "seller_performance": _SELLER_FILES + ("sellers_dataset.csv",),
+        "seller_category_performance": _SELLER_FILES + ("sellers_dataset.csv",),
+        "seller_leaderboards": _SELLER_FILES + ("sellers_dataset.csv",),
+    }
+
+    def __init__(self, cache, loader=read_dataset, data_dir=DATA_DIR):
+        self.cache = cache
+        self.loader = loader
+        self.data_dir = data_dir
+
+    def file_version(self, file_name):
+        """(mtime, ukuran) file di data_dir; None kalau file tidak ada (mis. loader in-memory)."""
+        try:
+            stat = os.stat(os.path.join(self.data_dir, file_name))
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def version(self, name):
+        """Versi file sumber untuk dataset, frame gabungan, atau agregat `name`.
+
+        Dipakai di key cache, jadi CSV yang diubah otomatis memakai entri baru
+        tanpa restart, sementara entri lama tinggal menunggu dieviksi.
+        """
+        if name in self.AGGREGATES:
+            name = self.AGGREGATES[name][0]
+        return tuple(self.file_version(f) for f in self.FRAME_SOURCES.get(name, (name,)))
+
+    def _cached(self, name, build, *params):
+        return self.cache.get_or_compute((name, *params, self.version(name)), build)
+
+    def dataset(self, file_name):
+        return self.cache.get_or_compute(("dataset", file_name, self.file_version(file_name)),
+                                         lambda: self.loader(file_name))
+
+    def delay_frame(self):
+        return self._cached("delay_frame", lambda: build_delay_frame(
+            self.dataset("orders_dataset.csv"),
+            self.dataset("order_reviews_dataset.csv"),
+        ))
+
+    def product_frame(self):
+        return self._cached("product_frame", lambda: build_product_frame(
+            self.dataset("order_items_dataset.csv"),
+            self.dataset("products_dataset.csv"),
+            self.dataset("order_reviews_dataset.csv"),
+            self.dataset("product_category_name_translation.csv"),
+        ))
+
+    def product_performance(self):
+        return self._cached("product_performance", lambda: product_performance(
+            self.dataset("order_items_dataset.csv"),
+            self.dataset("order_reviews_dataset.csv"),
+        ))
+
+    def product_index(self):
+        """KD-tree produk serupa; dibangun ulang hanya kalau file produk/penjualan berubah."""
+        def build():
+            products = self.dataset("products_dataset.csv").merge(
+                self.dataset("product_category_name_translation.csv"), on="product_category_name", how="left"
+            )
+            return ProductIndex(products, self.product_performance())
+        return self._cached("product_index", build)
+
+    def seller_item_frame(self):
+        return self._cached("seller_item_frame", lambda: build_seller_item_frame(
+            self.dataset("order_items_dataset.csv"),
+            self.dataset("orders_dataset.csv"),
+            self.dataset("order_reviews_dataset.csv"),
+            self.dataset("products_dataset.csv"),
+            self.dataset("product_category_name_translation.csv"),
+        ))
+
+    def seller_performance(self):
+        return self._cached("seller_performance", lambda: seller_performance(
+            self.seller_item_frame(), self.dataset("sellers_dataset.csv")
+        ))
+
+    def seller_category_performance(self):
+        return self._cached("seller_category_performance", lambda: seller_category_performance(
+            self.seller_item_frame(), self.seller_performance()
+        ))
+
+    def seller_leaderboards(self, metric="score", min_orders=5):
+        return self._cached(
+            "seller_leaderboards",
+            lambda: SellerLeaderboards(self.seller_performance(), self.seller_category_performance(),
+                                       metric=metric, min_orders=min_orders),
+            metric, min_orders,
+        )
+
+    def source(self, name):
+        if name == "product_frame":
+            return self.product_frame()
+        if name == "seller_performance":
+            return self.seller_performance()
+        return self.dataset(name)
+
+    def full_aggregate(self, name):
+        """Agregat `name` lengkap (semua baris); disimpan sekali per nama."""
+        source, func, _ = self.AGGREGATES[name]
+        return self.cache.get_or_compute(("aggregate", name, self.version(name)),
+                                         lambda: func(self.source(source), None))
+
+    def clamp_n(self, name, n=None):
+        """n efektif: default agregat kalau None, dan tidak lebih dari jumlah barisnya."""
+        rows = len(self.full_aggregate(name))
+        if n is None:
+            n = self.AGGREGATES[name][2]
+        return rows if n is None else min(n, rows)
+
+    def aggregate(self, name, n=None):
+        """Hasil agregat `name` sebagai DataFrame; n=None memakai n default agregat."""
+        return self.full_aggregate(name).head(self.clamp_n(name, n))
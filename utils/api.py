@@ -0,0 +1,164 @@
+# API JSON read-only untuk agregat dashboard (tanpa render chart)
+#
+# Endpoint:
+#   GET /api/aggregates                  -> daftar nama agregat
+#   GET /api/aggregates/<nama>?n=10      -> baris agregat (format records)
+#   GET /api/aggregates/<nama>?format=columns -> format kolom ringkas
+# Setiap respons membawa ETag; kirim If-None-Match untuk mendapat 304 tanpa body.
+import argparse
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from .aggregates import AggregateEngine
+from .cache import ResultCache
+
+FORMATS = ("records", "columns")
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def encode_aggregate(name, frame, fmt="records"):
+    """Serialisasi DataFrame agregat ke bytes JSON beserta ETag-nya."""
+    frame = frame.astype(object).where(frame.notna(), None)
+    if fmt == "columns":
+        payload = {"name": name, "columns": list(frame.columns), "data": frame.to_dict(orient="list")}
+    else:
+        payload = {"name": name, "data": frame.to_dict(orient="records")}
+    body = json.dumps(payload, default=_json_default, separators=(",", ":")).encode("utf-8")
+    return body, '"%s"' % hashlib.sha1(body).hexdigest()
+
+
+def etag_matches(header, etag):
+    """Cek header If-None-Match (boleh berisi beberapa tag, tag lemah W/, atau '*')."""
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+class AggregateRequestHandler(BaseHTTPRequestHandler):
+    engine = None  # diisi oleh make_server
+    server_version = "SSDCAggregates/1.0"
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def _method_not_allowed(self):
+        self._send_json(405, {"error": "read-only API, hanya GET/HEAD"}, extra_headers={"Allow": "GET, HEAD"})
+
+    do_POST = do_PUT = do_PATCH = do_DELETE = _method_not_allowed
+
+    def _respond(self, send_body):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        if parts == ["api", "aggregates"]:
+            self._send_json(200, {"aggregates": sorted(self.engine.AGGREGATES)}, send_body=send_body)
+            return
+        if len(parts) != 3 or parts[:2] != ["api", "aggregates"]:
+            self._send_json(404, {"error": "not found"}, send_body=send_body)
+            return
+        name = parts[2]
+        if name not in self.engine.AGGREGATES:
+            self._send_json(404, {"error": f"agregat tidak dikenal: {name}"}, send_body=send_body)
+            return
+        query = parse_qs(url.query)
+        fmt = query.get("format", ["records"])[0]
+        if fmt not in FORMATS:
+            self._send_json(400, {"error": f"format harus salah satu dari {list(FORMATS)}"}, send_body=send_body)
+            return
+        n = query.get("n", [None])[0]
+        if n is not None:
+            # isdigit saja menerima digit Unicode seperti "²" yang ditolak int(); panjang dibatasi
+            # karena int() menolak string > 4300 digit (dan n sebesar itu tak berguna)
+            if not (n.isascii() and n.isdigit()) or len(n) > 9 or int(n) < 1:
+                self._send_json(400, {"error": "n harus bilangan bulat positif"}, send_body=send_body)
+                return
+            n = int(n)
+        try:
+            # n dibatasi jumlah baris agregat supaya key cache tidak tumbuh per nilai n dari klien;
+            # versi file sumber ikut di key supaya ETag berubah kalau CSV-nya diubah
+            n = self.engine.clamp_n(name, n)
+            body, etag = self.engine.cache.get_or_compute(
+                ("api", name, n, fmt, self.engine.version(name)), lambda: encode_aggregate(name, self.engine.aggregate(name, n), fmt)
+            )
+        except FileNotFoundError as e:
+            self._send_json(503, {"error": f"dataset tidak tersedia: {e.filename}"}, send_body=send_body)
+            return
+        except Exception as e:
+            self._send_json(500, {"error": f"gagal menghitung agregat: {type(e).__name__}"}, send_body=send_body)
+            return
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            self.send_response(304)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            return
+        self._send_body(200, body, headers, send_body)
+
+    def _send_json(self, status, payload, send_body=True, extra_headers=None):
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        self._send_body(status, body, extra_headers or {}, send_body)
+
+    def _send_body(self, status, body, headers, send_body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Jangan spam log Streamlit untuk setiap request scraper
+        pass
+
+
+def make_server(engine, host="127.0.0.1", port=8502):
+    """Buat ThreadingHTTPServer yang melayani agregat dari `engine`."""
+    handler = type("BoundAggregateRequestHandler", (AggregateRequestHandler,), {"engine": engine})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_api_server(engine, host="127.0.0.1", port=8502):
+    """Jalankan server API di thread daemon (untuk disematkan di proses Streamlit)."""
+    server = make_server(engine, host, port)
+    thread = threading.Thread(target=server.serve_forever, name="ssdc-aggregates-api", daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API JSON agregat SSDC dashboard")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--cache-mb", type=float, default=512)
+    args = parser.parse_args()
+    engine = AggregateEngine(ResultCache(max_bytes=int(args.cache_mb * 1024 ** 2)))
+    server = make_server(engine, args.host, args.port)
+    print(f"Melayani agregat di http://{args.host}:{args.port}/api/aggregates")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
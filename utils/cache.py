@@ -0,0 +1,261 @@
+# Cache hasil antara (frame gabungan, agregat, potongan data) dengan batas memori
+import hashlib
+import itertools
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+SPILL_SUFFIX = ".pkl"
+
+
+def estimate_size(value):
+    """Perkiraan ukuran objek dalam byte (DataFrame/Series memakai memory_usage deep)."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class ResultCache:
+    """Cache in-memory dengan anggaran byte, eviksi LRU/LFU, dan spill opsional ke disk.
+
+    Nilai yang dikembalikan adalah objek yang sama dengan yang disimpan, jadi
+    perlakukan sebagai read-only (jangan tambah kolom pada DataFrame hasil cache).
+    Aman dipakai bersamaan oleh beberapa sesi Streamlit; baca/tulis file spill
+    dilakukan di luar lock supaya lookup sesi lain tidak ikut menunggu.
+
+    `spill_dir` harus folder khusus untuk satu instance: file spill lama di
+    dalamnya dihapus saat cache dibuat, dan total ukurannya dibatasi
+    `max_spill_bytes`.
+    """
+
+    def __init__(self, max_bytes=512 * 1024 ** 2, policy="lru", spill_dir=None, max_spill_bytes=2 * 1024 ** 3):
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"policy harus 'lru' atau 'lfu', bukan {policy!r}")
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.spill_dir = spill_dir
+        self.max_spill_bytes = max_spill_bytes
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            self._clear_spill_dir()
+        self._entries = OrderedDict()  # key -> (value, size), urutan = recency
+        self._freq = {}  # hanya untuk key yang ada di memori atau di disk
+        self._spilled = OrderedDict()  # key -> (path, size di memori, size di disk)
+        self._spill_seq = itertools.count()
+        self._key_locks = {}
+        self._lock = threading.RLock()
+        self.current_bytes = 0
+        self.spilled_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.spills = 0
+        self.disk_hits = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries or key in self._spilled
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        return self._lookup(key, default)
+
+    def _lookup(self, key, default, count_miss=True):
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._touch(key)
+                return self._entries[key][0]
+            if key not in self._spilled:
+                self.misses += count_miss
+                return default
+            path, size, disk_size = self._spilled[key]
+            # Entri yang lebih besar dari anggaran memori dilayani langsung dari file-nya;
+            # entri lain dikeluarkan dari daftar spill lalu dipindah kembali ke memori.
+            oversized = size > self.max_bytes
+            if not oversized:
+                del self._spilled[key]
+                self.spilled_bytes -= disk_size
+        loaded, value = self._read_spill(path)
+        if not oversized:
+            self._remove_file(path)
+        with self._lock:
+            if not loaded:
+                if oversized and self._spilled.get(key, (None,))[0] == path:
+                    self._drop_spilled(key)
+                self._forget(key)
+                self.misses += count_miss
+                return default
+            self.hits += 1
+            self.disk_hits += 1
+        if not oversized:
+            self.put(key, value)
+        return value
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                # Terlalu besar untuk memori: langsung ke disk kalau bisa, selain itu tidak disimpan
+                self._freq.pop(key, None)
+                victims = [(key, value, size)] if self.spill_dir else []
+            else:
+                self._entries[key] = (value, size)
+                self._freq[key] = self._freq.get(key, 0) + 1
+                self.current_bytes += size
+                victims = self._evict(protect=key)
+        self._spill(victims)
+        return value
+
+    def get_or_compute(self, key, compute):
+        """Ambil dari cache; kalau tidak ada, hitung sekali (satu thread per key) lalu simpan."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is not sentinel:
+            return value
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            # Thread lain mungkin sudah menghitung (atau entrinya sudah di-spill) selama kita
+            # menunggu lock. Kalau ketemu, lookup ini tercatat sebagai hit, bukan miss.
+            value = self._lookup(key, sentinel, count_miss=False)
+            if value is sentinel:
+                value = self.put(key, compute())
+            else:
+                with self._lock:
+                    self.misses -= 1
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._discard(key)
+            self._freq.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._spilled):
+                self._drop_spilled(key)
+            self._entries.clear()
+            self._freq.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Counter hit/miss/eviksi dan pemakaian byte, untuk menentukan ukuran cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "spilled_entries": len(self._spilled),
+                "spilled_bytes": self.spilled_bytes,
+                "max_spill_bytes": self.max_spill_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "spills": self.spills,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    # --- internal (method yang dipanggil dengan lock dipegang ditandai "lock") ---
+    def _touch(self, key):  # lock
+        self._entries.move_to_end(key)
+        self._freq[key] = self._freq.get(key, 0) + 1
+
+    def _forget(self, key):  # lock
+        if key not in self._entries and key not in self._spilled:
+            self._freq.pop(key, None)
+
+    def _victim(self, protect):  # lock
+        if self.policy == "lfu":
+            # Frekuensi terkecil; seri dipecah oleh recency (urutan OrderedDict). Entri yang
+            # baru dimasukkan dilindungi, kalau tidak ia selalu jadi korban (frekuensi 1).
+            candidates = [k for k in self._entries if k != protect] or list(self._entries)
+            return min(candidates, key=lambda k: self._freq.get(k, 0))
+        return next(iter(self._entries))
+
+    def _evict(self, protect=None):  # lock
+        """Keluarkan entri sampai muat anggaran; kembalikan yang perlu ditulis ke disk."""
+        victims = []
+        while self.current_bytes > self.max_bytes and self._entries:
+            key = self._victim(protect)
+            value, size = self._entries.pop(key)
+            self.current_bytes -= size
+            self.evictions += 1
+            if self.spill_dir:
+                victims.append((key, value, size))
+            else:
+                self._forget(key)
+        return victims
+
+    def _discard(self, key):  # lock
+        if key in self._entries:
+            self.current_bytes -= self._entries.pop(key)[1]
+        if key in self._spilled:
+            self._drop_spilled(key)
+
+    def _drop_spilled(self, key):  # lock
+        path, _, disk_size = self._spilled.pop(key)
+        self.spilled_bytes -= disk_size
+        self._remove_file(path)
+        self._forget(key)
+
+    def _spill(self, victims):
+        """Tulis entri tereviksi ke disk di luar lock, lalu daftarkan dan tegakkan batas disk."""
+        for key, value, size in victims:
+            digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+            path = os.path.join(self.spill_dir, f"{digest}-{next(self._spill_seq)}{SPILL_SUFFIX}")
+            try:
+                with open(path, "wb") as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                disk_size = os.path.getsize(path)
+            except (OSError, pickle.PicklingError, TypeError, AttributeError):
+                self._remove_file(path)
+                with self._lock:
+                    self._forget(key)
+                continue
+            with self._lock:
+                if key in self._entries or key in self._spilled:
+                    # Versi yang lebih baru sudah disimpan selama file ini ditulis
+                    self._remove_file(path)
+                    continue
+                self._spilled[key] = (path, size, disk_size)
+                self.spilled_bytes += disk_size
+                self.spills += 1
+                while self.spilled_bytes > self.max_spill_bytes and self._spilled:
+                    self._drop_spilled(next(iter(self._spilled)))
+
+    def _clear_spill_dir(self):
+        for name in os.listdir(self.spill_dir):
+            if name.endswith(SPILL_SUFFIX):
+                self._remove_file(os.path.join(self.spill_dir, name))
+
+    @staticmethod
+    def _read_spill(path):
+        try:
+            with open(path, "rb") as f:
+                return True, pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return False, None
+
+    @staticmethod
+    def _remove_file(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
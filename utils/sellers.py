@@ -0,0 +1,174 @@
+# Skor kinerja penjual dan leaderboard top-k / bottom-k per provinsi dan kategori
+import heapq
+
+import numpy as np
+import pandas as pd
+
+# Bobot komponen skor (total 1.0); skor akhir berskala 0-100
+SCORE_WEIGHTS = {
+    "review": 0.35,
+    "on_time": 0.30,
+    "revenue": 0.25,
+    "freight": 0.10,
+}
+
+# Jumlah maksimum baris leaderboard yang disimpan per grup
+MAX_K = 50
+
+
+def build_seller_item_frame(items, orders, reviews, products, prod_cat):
+    """Satu baris per item order dengan flag telat, review order, dan kategori produk.
+
+    Telat mengikuti bagian keterlambatan dashboard: selisih hari kirim vs
+    estimasi > 0, jadi terkirim di hari estimasi tetap dianggap tepat waktu.
+    """
+    frame = items[["order_id", "seller_id", "product_id", "price", "freight_value"]]
+    delivered = pd.to_datetime(orders["order_delivered_customer_date"])
+    estimated = pd.to_datetime(orders["order_estimated_delivery_date"])
+    order_status = pd.DataFrame({
+        "order_id": orders["order_id"],
+        "delivered": delivered.notna(),
+        "late": (delivered - estimated).dt.days > 0,
+    })
+    order_review = reviews.groupby("order_id")["review_score"].mean()
+    # Kategori: nama Inggris, lalu nama Portugis kalau belum ada terjemahannya
+    category = products.merge(prod_cat, on="product_category_name", how="left").set_index("product_id")
+    category = category["product_category_name_english"].fillna(category["product_category_name"])
+
+    frame = frame.merge(order_status, on="order_id", how="left")
+    frame = frame.join(order_review, on="order_id").join(category.rename("category"), on="product_id")
+    frame["category"] = frame["category"].fillna("unknown")
+    frame[["delivered", "late"]] = frame[["delivered", "late"]].fillna(False).astype(bool)
+    return frame
+
+
+def _aggregate(frame, keys):
+    """Metrik kinerja per `keys` dalam satu groupby.
+
+    Metrik per order (jumlah order, telat, review) hanya dihitung dari baris
+    pertama tiap order di dalam grup, supaya order multi-item tidak dobel.
+    """
+    first = ~frame.duplicated(keys + ["order_id"])
+    perf = frame.assign(
+        first_in_order=first,
+        delivered_order=first & frame["delivered"],
+        late_order=first & frame["delivered"] & frame["late"],
+        order_review=frame["review_score"].where(first),
+    ).groupby(keys).agg(
+        revenue=("price", "sum"),
+        freight=("freight_value", "sum"),
+        orders=("first_in_order", "sum"),
+        delivered_orders=("delivered_order", "sum"),
+        late_orders=("late_order", "sum"),
+        avg_review=("order_review", "mean"),
+    )
+    perf["late_rate"] = perf["late_orders"] / perf["delivered_orders"].replace(0, np.nan)
+    perf["freight_share"] = perf["freight"] / (perf["revenue"] + perf["freight"]).replace(0, np.nan)
+    return perf
+
+
+def seller_performance(frame, sellers):
+    """Metrik per penjual: revenue, order, review, late rate, porsi ongkir, skor, kategori utama."""
+    perf = _aggregate(frame, ["seller_id"])
+    perf["score"] = seller_score(perf)
+    # Kategori utama = kategori dengan revenue terbesar untuk penjual tersebut
+    cat_revenue = frame.groupby(["seller_id", "category"])["price"].sum()
+    perf["main_category"] = cat_revenue.groupby(level=0).idxmax().str[1]
+    return perf.join(sellers.set_index("seller_id")[["seller_city", "seller_state"]])
+
+
+def seller_category_performance(frame, perf):
+    """Metrik yang sama per pasangan (penjual, kategori), dihitung dalam kategori tersebut.
+
+    Indeks: seller_id; kolom `category` menandai kategorinya. Kolom lokasi dan
+    kategori utama diambil dari `perf` (hasil seller_performance).
+    """
+    cat_perf = _aggregate(frame, ["seller_id", "category"]).reset_index(level="category")
+    cat_perf["score"] = seller_score(cat_perf, within="category")
+    return cat_perf.join(perf[["main_category", "seller_city", "seller_state"]])
+
+
+def seller_score(perf, within=None):
+    """Skor 0-100 dari review, ketepatan kirim, persentil revenue, dan porsi ongkir.
+
+    Nilai kosong (mis. belum ada review atau order terkirim) diisi median
+    supaya penjual baru tidak otomatis berada di dasar leaderboard. Dengan
+    `within` (nama kolom, mis. "category") persentil revenue dan median
+    pengisi dihitung per grup kolom itu, bukan atas semua baris.
+    """
+    components = pd.DataFrame({
+        "review": (perf["avg_review"] - 1) / 4,
+        "on_time": 1 - perf["late_rate"],
+        "revenue": perf["revenue"],
+        "freight": 1 - perf["freight_share"],
+    }).reset_index(drop=True)  # indeks posisi: seller_id bisa berulang di frame per kategori
+    if within is None:
+        components["revenue"] = components["revenue"].rank(pct=True)
+    else:
+        groups = perf[within].to_numpy()
+        components["revenue"] = components.groupby(groups)["revenue"].rank(pct=True)
+        components = components.fillna(components.groupby(groups).transform("median"))
+    # Sisa nilai kosong (grup yang seluruhnya kosong) diisi median keseluruhan
+    components = components.fillna(components.median())
+    weights = pd.Series(SCORE_WEIGHTS)
+    score = (components[weights.index] * weights).sum(axis=1) * 100
+    return pd.Series(score.to_numpy(), index=perf.index)
+
+
+def _select(metric, k):
+    # heapq.nlargest/nsmallest: O(n log k), tanpa sort penuh; seri dipecah oleh posisi baris
+    pairs = [(value, pos) for pos, value in enumerate(metric.to_numpy()) if not np.isnan(value)]
+    top = [pos for _, pos in heapq.nlargest(k, pairs)]
+    bottom = [pos for _, pos in heapq.nsmallest(k, pairs)]
+    return top, bottom
+
+
+class SellerLeaderboards:
+    """Leaderboard top-k dan bottom-k yang dihitung sekali untuk semua grup.
+
+    Grup: semua penjual (None), per `seller_state`, dan per `category`. Untuk
+    kategori yang diperingkat adalah baris (penjual, kategori) dengan metrik
+    dalam kategori itu, jadi penjual multi-kategori muncul di tiap kategorinya.
+    Hanya baris dengan minimal `min_orders` order yang masuk peringkat.
+    """
+
+    GROUPS = ("seller_state", "category")
+
+    def __init__(self, perf, category_perf, metric="score", min_orders=5, max_k=MAX_K):
+        self.metric = metric
+        self.min_orders = min_orders
+        self.max_k = max_k
+        self.boards = {}
+        eligible = perf[perf["orders"] >= min_orders]
+        self._add(None, None, eligible)
+        for group, rows in eligible.groupby("seller_state"):
+            self._add("seller_state", group, rows)
+        eligible = category_perf[category_perf["orders"] >= min_orders]
+        for group, rows in eligible.groupby("category"):
+            self._add("category", group, rows)
+
+    def _add(self, by, group, rows):
+        top, bottom = _select(rows[self.metric], self.max_k)
+        self.boards[(by, group)] = (rows.iloc[top], rows.iloc[bottom])
+
+    def groups(self, by):
+        return sorted(group for group_by, group in self.boards if group_by == by)
+
+    def top(self, by=None, group=None, k=10):
+        return self.boards[(by, group)][0].head(k)
+
+    def bottom(self, by=None, group=None, k=10):
+        return self.boards[(by, group)][1].head(k)
+
+
+def top_sellers(perf, n=10, min_orders=5):
+    """Penjual dengan skor tertinggi (untuk API agregat); n=None berarti semua penjual."""
+    eligible = perf[perf["orders"] >= min_orders]
+    top, _ = _select(eligible["score"], len(eligible) if n is None else n)
+    return eligible.iloc[top][["seller_state", "main_category", "revenue", "orders", "avg_review", "late_rate", "freight_share", "score"]].reset_index()
+
+
+def seller_category_breakdown(category_perf, seller_id):
+    """Drill-down satu penjual: revenue, order, review, dan late rate per kategori."""
+    rows = category_perf.loc[[seller_id], ["category", "revenue", "orders", "avg_review", "late_rate", "score"]]
+    return rows.sort_values("revenue", ascending=False).reset_index(drop=True)
@@ -0,0 +1,96 @@
+# Indeks kemiripan produk (nearest neighbour) untuk SSDC dashboard
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+# Atribut numerik produk yang dipakai sebagai ruang kemiripan
+PRODUCT_FEATURES = [
+    "product_weight_g",
+    "product_length_cm",
+    "product_height_cm",
+    "product_width_cm",
+    "product_photos_qty",
+    "product_description_lenght",
+]
+
+
+class ProductIndex:
+    """KD-tree atas atribut produk yang sudah dinormalisasi (log1p + z-score).
+
+    Selain tree global, disimpan juga satu tree per kategori supaya pencarian
+    "hanya kategori yang sama" tetap berupa satu query ke tree kecil.
+    `table` berisi atribut + performa (`performance`, opsional) per produk dalam
+    urutan yang sama dengan tree, jadi hasil query cukup diambil per posisi.
+    """
+
+    def __init__(self, products, performance=None, features=PRODUCT_FEATURES):
+        products = products.drop_duplicates("product_id").reset_index(drop=True)
+        values = products[features].astype(float)
+        # Isi nilai kosong dengan median, lalu log1p agar berat/ukuran ekstrem tidak dominan
+        values = np.log1p(values.fillna(values.median()).clip(lower=0))
+        std = values.std().replace(0, 1)
+        self.features = list(features)
+        self.points = ((values - values.mean()) / std).to_numpy()
+        self.product_ids = products["product_id"].to_numpy()
+        self.categories = products["product_category_name"].fillna("unknown").to_numpy()
+        self.position = {pid: i for i, pid in enumerate(self.product_ids)}
+        self.table = self._build_table(products, performance)
+        self.tree = cKDTree(self.points)
+        self.category_trees = {}
+        for cat, idx in pd.Series(np.arange(len(products))).groupby(self.categories):
+            idx = idx.to_numpy()
+            self.category_trees[cat] = (cKDTree(self.points[idx]), idx)
+
+    @staticmethod
+    def _build_table(products, performance):
+        table = products.copy()
+        # Label kategori: nama Inggris, lalu nama Portugis, lalu "unknown"
+        label = table["product_category_name"]
+        if "product_category_name_english" in table:
+            label = table["product_category_name_english"].fillna(label)
+        table["category_label"] = label.fillna("unknown")
+        if performance is not None:
+            table = table.join(performance, on="product_id")
+            table = table.fillna({"total_items": 0, "total_orders": 0, "total_sales": 0.0})
+        return table
+
+    def __len__(self):
+        return len(self.product_ids)
+
+    def _query_positions(self, product_id, k, same_category):
+        pos = self.position[product_id]
+        if same_category:
+            tree, idx = self.category_trees[self.categories[pos]]
+        else:
+            tree, idx = self.tree, None
+        k_query = min(k + 1, tree.n)
+        dist, nn = tree.query(self.points[pos], k=k_query)
+        dist, nn = np.atleast_1d(dist), np.atleast_1d(nn)
+        if idx is not None:
+            nn = idx[nn]
+        keep = nn != pos
+        return nn[keep][:k], dist[keep][:k]
+
+    def similar(self, product_id, k=5, same_category=False):
+        """Tabel k produk termirip (tanpa produk itu sendiri): atribut, jarak, penjualan, review."""
+        positions, dist = self._query_positions(product_id, k, same_category)
+        result = self.table.iloc[positions].reset_index(drop=True)
+        result.insert(1, "distance", dist)
+        return result
+
+
+def product_performance(items, reviews):
+    """Ringkasan penjualan dan review per produk (jumlah item, total penjualan, rata-rata review)."""
+    sales = items.groupby("product_id").agg(
+        total_items=("order_id", "size"),
+        total_orders=("order_id", "nunique"),
+        total_sales=("price", "sum"),
+    )
+    order_reviews = reviews.groupby("order_id")["review_score"].mean()
+    product_orders = items[["order_id", "product_id"]].drop_duplicates()
+    product_orders = product_orders.join(order_reviews, on="order_id")
+    review_stats = product_orders.groupby("product_id")["review_score"].agg(
+        avg_review="mean", total_reviews="count"
+    )
+    return sales.join(review_stats, how="left")
+